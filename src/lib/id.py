@@ -4,15 +4,23 @@ from typing import NewType, Optional
 
 class Guid:
 
+    __slots__ = ("_raw", "_hash")
+
     def __init__(self, raw: str):
         self._raw = raw.upper()
+        self._hash = hash(self._raw)
 
     @property
     def raw(self) -> str:
         return self._raw
 
     def __hash__(self) -> int:
-        return hash(self._raw)
+        return self._hash
+
+    def __reduce__(self):
+        # The cached hash is only valid in the interpreter that computed it,
+        # so rebuild from the raw value when unpickling.
+        return (Guid, (self._raw,))
 
     def __eq__(self, other) -> bool:
         return isinstance(other, Guid) and self._raw == other._raw
@@ -26,6 +34,8 @@ Name = NewType("Name", str)
 
 class AssemblyId:
 
+    __slots__ = ("_name", "_path")
+
     def __init__(
             self,
             name: Name, path: Optional[Path],
@@ -59,9 +69,14 @@ class AssemblyId:
 
 class ProjectId:
 
+    # Project ids key most of the analysis tables, so the hash is computed
+    # once up front.
+    __slots__ = ("_name", "_path", "_hash")
+
     def __init__(self, name: str, path: str | Path):
         self._name = name
         self._path = Path(path)
+        self._hash = hash((self._name, self._path))
 
     @property
     def name(self) -> str:
@@ -84,7 +99,11 @@ class ProjectId:
         )
 
     def __hash__(self) -> int:
-        return hash((self._name, self._path))
+        return self._hash
+
+    def __reduce__(self):
+        # see Guid.__reduce__
+        return (ProjectId, (self._name, self._path))
 
     def __str__(self):
         return f"ProjectId({self.name}, {self.path})"
@@ -92,6 +111,8 @@ class ProjectId:
 
 class SourceId:
 
+    __slots__ = ("_name", "_path")
+
     def __init__(self, name: str, path: Path):
         self._name = name
         self._path = path
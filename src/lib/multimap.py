@@ -13,7 +13,7 @@ _MMVV_V = TypeVar("_MMVV_V", bound=Hashable)
 
 class MultiMapValuesView(ValuesView[SetView[_MMVV_V]]):
 
-    def __init__(self, view: ValuesView[set[_MMVV_V]]):
+    def __init__(self, view: ValuesView[Set[_MMVV_V]]):
         self._view = view
 
     def __len__(self) -> int:
@@ -33,7 +33,7 @@ _MMIV_V = TypeVar("_MMIV_V", bound=Hashable)
 
 class MultiMapItemsView(ItemsView[_MMIV_K, SetView[_MMIV_V]]):
 
-    def __init__(self, view: ItemsView[_MMIV_K, set[_MMIV_V]]):
+    def __init__(self, view: ItemsView[_MMIV_K, Set[_MMIV_V]]):
         self._view = view
 
     def __len__(self) -> int:
@@ -100,13 +100,20 @@ class MultiMap(Generic[_MM_K, _MM_V]):
         del self._data[key]
 
     def add(self, key: _MM_K, value: _MM_V):
-        if key in self._data:
-            value_set = self._data[key]
-        else:
+        value_set = self._data.get(key)
+        if value_set is None:
             value_set = set()
             self._data[key] = value_set
         value_set.add(value)
 
+    def extend(self, key: _MM_K, values: Iterable[_MM_V]):
+        if key in self._data:
+            self._data[key].update(values)
+        else:
+            value_set = set(values)
+            if len(value_set) > 0:
+                self._data[key] = value_set
+
     def remove(self, key: _MM_K, value: _MM_V):
         value_set = self._data[key]
         value_set.remove(value)
@@ -132,18 +139,35 @@ _MMV_V = TypeVar("_MMV_V", bound=Hashable)
 
 class MultiMapView(Mapping[_MMV_K, SetView[_MMV_V]]):
 
-    def __init__(self, data: MultiMap[_MMV_K, _MMV_V]):
-        self._data = data
+    _data: Mapping[_MMV_K, Set[_MMV_V]]
+
+    # Accepts either a MultiMap or a plain mapping of keys to value sets.
+    def __init__(
+            self,
+            data: MultiMap[_MMV_K, _MMV_V] | Mapping[_MMV_K, Set[_MMV_V]]
+    ):
+        if isinstance(data, MultiMap):
+            self._data = data._data
+        else:
+            self._data = data
 
     def __len__(self) -> int:
         return len(self._data)
 
     def __getitem__(self, key: _MMV_K) -> SetView[_MMV_V]:
-        return self._data[key]
+        return SetView(self._data[key])
 
     def __iter__(self) -> Iterator[_MMV_K]:
         return iter(self._data)
 
+    # Walk the wrapped mapping's own views instead of the Mapping defaults,
+    # which look every key up again through __getitem__.
+    def values(self) -> MultiMapValuesView[_MMV_V]:
+        return MultiMapValuesView(self._data.values())
+
+    def items(self) -> MultiMapItemsView[_MMV_K, _MMV_V]:
+        return MultiMapItemsView(self._data.items())
+
 
 __all__ = [
     "MultiMap", "MultiMapView",
@@ -1,3 +1,4 @@
+import functools
 import re
 
 from typing import Optional
@@ -98,6 +99,9 @@ just_config = re.compile(just_config_source)
 just_platform = re.compile(just_platform_source)
 combined = re.compile(combined_source)
 
+
+# The same handful of conditions recur across every project in a repository.
+@functools.cache
 def parse_condition(
         text: str,
         configuration: Optional[str] = None,
@@ -1,7 +1,10 @@
 import enum
+import functools
+import os
 import re
+import sys
 
-import xml.dom.minidom as xml
+import xml.etree.ElementTree as xml
 
 from collections.abc import Iterator, KeysView, ValuesView
 from dataclasses import dataclass
@@ -12,7 +15,7 @@ from typing import Generic, NewType, Optional, Union, Self, TypeVar, TYPE_CHECKI
 from .. import util
 from ..data_view import MapView, SetView
 from ..id import AssemblyId, Guid, Name, ProjectId, SourceId
-from ..multimap import MultiMap, MultiMapView
+from ..multimap import MultiMapView
 from ..var_env import VarEnv
 
 from . import const  # necessary for matching against constants
@@ -27,28 +30,58 @@ if TYPE_CHECKING:
     from .registry import ProjectRegistry
 
 _path_has_leading_subst_regexp = re.compile(r"\$\([^\)]*\).*")
+_PATH_HAS_LEADING_SUBST_MATCH = _path_has_leading_subst_regexp.match
 
 
 def _path_has_leading_subst(path: str | Path) -> bool:
-    return _path_has_leading_subst_regexp.match(str(path)) is not None
+    path = str(path)
+    # most paths are plain: skip the regex unless one could match
+    return (
+        path.startswith("$(") and
+        _PATH_HAS_LEADING_SUBST_MATCH(path) is not None
+    )
 
 
-def _get_xml_text(node: xml.Node) -> str:
-    def go(node: xml.Node, accum: list[str]):
-        for node in node.childNodes:
-            if node.nodeType == xml.Node.TEXT_NODE:  # type: ignore
-                accum.append(node.data)  # type: ignore
-            elif node.nodeType == xml.Node.ELEMENT_NODE:  # type: ignore
-                go(node, accum)
-    accum: list[str] = []
-    go(node, accum)
-    return "".join(accum)
+def _get_xml_text(elem: xml.Element) -> str:
+    # leaf elements hold their whole text in .text
+    if len(elem) == 0:
+        return elem.text or ""
+    return "".join(elem.itertext())
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_xml(path: str, mtime_ns: int) -> xml.Element:
+    # Solutions in one repo share most of their projects; the mtime is only
+    # part of the key, so an edited file is parsed again.
+    return xml.parse(path).getroot()
+
+
+def _split_tag(tag: str) -> tuple[str, str]:
+    # ElementTree spells namespaced tags as "{namespace}local".
+    if tag.startswith("{"):
+        namespace, _, local_name = tag[1:].partition("}")
+        return (namespace, local_name)
+    return ("", tag)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+def _tag_prefix(root: xml.Element) -> str:
+    # Elements of a csproj share the namespace of its root node, so we
+    # qualify descendant lookups with it.
+    namespace, _ = _split_tag(root.tag)
+    return "" if "" == namespace else "{" + namespace + "}"
 
 
 def _build_parse_assembly_name_regexp():
     return re.compile(r'\s*(?P<name>[^\s,]*)\s*,?')
 
 
+_PARSE_ASSEMBLY_NAME_MATCH = _build_parse_assembly_name_regexp().match
+
+
 _PLO_T = TypeVar("_PLO_T")
 
 
@@ -85,11 +118,18 @@ ProjectLoadResult = Union[
 
 class Project:
 
+    __slots__ = (
+        "_project_id", "_project_dir",
+        "_project_ref_ids", "_assembly_ref_ids", "_source_ref_ids",
+        "_props"
+    )
+
     _PROJECT_XMLNS: str = "http://schemas.microsoft.com/developer/msbuild/2003"
 
     _project_id: ProjectId
+    _project_dir: Path
 
-    _project_ref_ids: MultiMap[ProjectId, Guid]
+    _project_ref_ids: dict[ProjectId, set[Guid]]
 
     # note: we are not using is_nuget_assembly as a distinguishing factor
     _assembly_ref_ids: set[AssemblyId]
@@ -98,15 +138,14 @@ class Project:
 
     _props: dict[str, str]
 
-    _PARSE_ASSEMBLY_NAME_REGEXP = _build_parse_assembly_name_regexp()
-
     # NB: external code should not construct a Project manually
     def __init__(
             self,
             project_id: ProjectId
     ):
         self._project_id = project_id
-        self._project_ref_ids = MultiMap()
+        self._project_dir = project_id.path.parent
+        self._project_ref_ids = dict()
         self._assembly_ref_ids = set()
         self._source_ref_ids = set()
         self._props = dict()
@@ -157,23 +196,23 @@ class Project:
         if output_type is None:
             return None
         output_name = assembly_name + "." + output_type.to_extension()
-        path = self._normalize_relpath(output_path) / output_name
-        return AssemblyId(Name(assembly_name), path)
+        output_dir = util.normalize_windows_relpath(self._project_dir, output_path)
+        return AssemblyId(Name(assembly_name), output_dir / output_name)
 
-    def _normalize_relpath(self, path: str | Path) -> Path:
-        context = self.project_id.path.parent
-        return util.normalize_windows_relpath(context, path)
+    def _normalize_relpath(self, registry: "ProjectRegistry", path: str) -> Path:
+        return registry.normalize_relpath(self._project_dir, path)
 
     def _add_assembly_id(self, assembly_id: AssemblyId):
-        if assembly_id not in self._assembly_ref_ids:
-            self._assembly_ref_ids.add(assembly_id)
+        self._assembly_ref_ids.add(assembly_id)
 
     def _load_assembly_ref(
             self,
+            registry: "ProjectRegistry",
             assembly_ref: xml.Element
     ) -> Optional[AssemblyId]:
         # All references must(?) have an include attribute.
-        if not assembly_ref.hasAttribute("Include"):
+        name = assembly_ref.get("Include")
+        if name is None:
             return None
 
         # The include attribute will contain EITHER a name OR a path depending
@@ -192,28 +231,27 @@ class Project:
         #   </Reference>
 
         is_nuget_assembly = False
-        name = assembly_ref.getAttribute("Include")
-        path: str | Path | None = None
-
-        for child in assembly_ref.childNodes:
-            if child.nodeType == xml.Node.ELEMENT_NODE:
-                if child.tagName == "NuGetPackageId":
-                    # We have a NuGet package!
-                    if path is None:
-                        is_nuget_assembly = True
-                        # As seen above, nuget package names for some reason
-                        # live in the Include attribute of the Reference node.
-                        path = name
-                        name = _get_xml_text(child)
-                elif child.tagName == "HintPath":
-                    if path is None:
-                        path = _get_xml_text(child)
+        path: str | None = None
+
+        for child in assembly_ref:
+            tag_name = _local_name(child.tag)
+            if tag_name == "NuGetPackageId":
+                # We have a NuGet package!
+                if path is None:
+                    is_nuget_assembly = True
+                    # As seen above, nuget package names for some reason
+                    # live in the Include attribute of the Reference node.
+                    path = name
+                    name = _get_xml_text(child)
+            elif tag_name == "HintPath":
+                if path is None:
+                    path = _get_xml_text(child)
 
         if not is_nuget_assembly:
             # With plain assembly references, the Include attribute is
             # permitted to be a comma-separated list of fields. We only care
             # about the leading element, however.
-            match = self._PARSE_ASSEMBLY_NAME_REGEXP.match(name)
+            match = _PARSE_ASSEMBLY_NAME_MATCH(name)
             if match is None:
                 raise RuntimeError(f"strange assembly name: {name}")
             name = match.group("name")
@@ -221,9 +259,8 @@ class Project:
             # If we don't have a nuget package and we didn't find a HintPath
             # element, then we check for existence of a HintPath attribute.
             if path is None:
-                if assembly_ref.hasAttribute("HintPath"):
-                    path = assembly_ref.getAttribute("HintPath")
-                elif name.endswith(".dll"):
+                path = assembly_ref.get("HintPath")
+                if path is None and name.lower().endswith(".dll"):
                     # Sometimes when we don't have a path, the Include
                     # attribute might have actually contained a path. I don't
                     # know if there's a good way to for sure when an assembly
@@ -232,57 +269,64 @@ class Project:
                     name = util.normalize_windows_path(name).stem
 
         # Now we're free to normalize our path (if we have one).
+        repo_path: Optional[Path] = None
         if path is not None:
             if _path_has_leading_subst(path):
-                path = util.normalize_windows_path(path)
+                repo_path = util.normalize_windows_path(path)
             else:
-                path = self._normalize_relpath(path)
+                repo_path = self._normalize_relpath(registry, path)
 
-        return AssemblyId(Name(name), path)
+        # common assemblies (System, ...) are referenced by most projects
+        return AssemblyId(Name(sys.intern(name)), repo_path)
 
-    def _load_assembly_refs(self, root: xml.Document):
-        for assembly_ref in root.getElementsByTagName("Reference"):
-            assembly_id = self._load_assembly_ref(assembly_ref)
+    def _load_assembly_refs(self, registry: "ProjectRegistry", root: xml.Element):
+        for assembly_ref in root.iter(_tag_prefix(root) + "Reference"):
+            assembly_id = self._load_assembly_ref(registry, assembly_ref)
             if assembly_id is not None:
                 self._add_assembly_id(assembly_id)
 
     def _add_project_id(self, guid: Guid, project_id: ProjectId):
-        self._project_ref_ids.add(project_id, guid)
+        guids = self._project_ref_ids.get(project_id)
+        if guids is None:
+            self._project_ref_ids[project_id] = {guid}
+        else:
+            guids.add(guid)
 
     def _load_project_ref(
             self,
             registry: "ProjectRegistry",
             project_ref: xml.Element
     ) -> Optional[ProjectLoadResult[tuple[Guid, ProjectId]]]:
-        if not project_ref.hasAttribute("Include"):
+        include = project_ref.get("Include")
+        if include is None:
             return None
 
         name = None
         guid = None
 
-        for child in project_ref.childNodes:
-            if child.nodeType == xml.Node.ELEMENT_NODE:
-                if child.tagName == "Name":
-                    if name is None:
-                        name = _get_xml_text(child)
-                elif child.tagName == "Project":
-                    if guid is None:
-                        guid = _get_xml_text(child)
+        for child in project_ref:
+            tag_name = _local_name(child.tag)
+            if tag_name == "Name":
+                if name is None:
+                    name = _get_xml_text(child)
+            elif tag_name == "Project":
+                if guid is None:
+                    guid = _get_xml_text(child)
 
         if name is None or guid is None:
             return None
 
         guid = guid.lstrip("{").rstrip("}")
-        path = self._normalize_relpath(project_ref.getAttribute("Include"))
+        path = self._normalize_relpath(registry, include)
 
-        return ProjectLoadOk((Guid(guid), ProjectId(name, path)))
+        return ProjectLoadOk((registry.make_guid(guid), ProjectId(name, path)))
 
     def _load_project_refs(
             self,
             registry: "ProjectRegistry",
-            root: xml.Document
+            root: xml.Element
     ) -> ProjectLoadResult[None]:
-        for project_ref in root.getElementsByTagName("ProjectReference"):
+        for project_ref in root.iter(_tag_prefix(root) + "ProjectReference"):
             result = self._load_project_ref(registry, project_ref)
             if result is not None:
                 match result:
@@ -295,26 +339,36 @@ class Project:
         return ProjectLoadOk(None)
 
     def _add_source_id(self, source_id: SourceId):
-        if source_id not in self._source_ref_ids:
-            self._source_ref_ids.add(source_id)
+        self._source_ref_ids.add(source_id)
 
-    def _load_source_ref(self, root: xml.Element) -> Optional[list[SourceId]]:
-        INCLUDE = "Include"
-        if not root.hasAttribute(INCLUDE):
+    def _load_source_ref(
+            self,
+            registry: "ProjectRegistry",
+            root: xml.Element
+    ) -> Optional[list[SourceId]]:
+        include = root.get("Include")
+        if include is None:
             return None
+        # The common case is a single path: skip splitting it into a list.
+        if ";" not in include:
+            path_string = include.strip()
+            if "" == path_string:
+                return None
+            path = self._normalize_relpath(registry, path_string)
+            return [SourceId(path.name, path)]
         # source Includes may contain more than one path, separated by semicolons
         sources = []
-        for item in root.getAttribute(INCLUDE).split(";"):
+        for item in include.split(";"):
             path_string = item.strip()
             if "" != path_string:
-                path = self._normalize_relpath(path_string)
+                path = self._normalize_relpath(registry, path_string)
                 name = path.name
                 sources.append(SourceId(name, path))
         return None if len(sources) <= 0 else sources
 
-    def _load_source_refs(self, root: xml.Document):
-        for source_ref in root.getElementsByTagName("Compile"):
-            sources = self._load_source_ref(source_ref)
+    def _load_source_refs(self, registry: "ProjectRegistry", root: xml.Element):
+        for source_ref in root.iter(_tag_prefix(root) + "Compile"):
+            sources = self._load_source_ref(registry, source_ref)
             if sources is not None:
                 for source_id in sources:
                     self._add_source_id(source_id)
@@ -322,7 +376,7 @@ class Project:
     def _load_props(
             self,
             registry: "ProjectRegistry",
-            root: xml.Document
+            root: xml.Element
     ) -> ProjectLoadResult[None]:
 
         def match_condition(child, env):
@@ -333,28 +387,22 @@ class Project:
                     # otherwise, require match on env
                     (key in env and env[key] == value)
                 )
-            if not child.hasAttribute(CONDITION):
+            condition = child.get(CONDITION)
+            if not condition:
                 return True  # no condition! always match
-            configuration, platform = parse_condition(
-                child.getAttribute(CONDITION)
-            )
+            configuration, platform = parse_condition(condition)
             return (
                 match_env(CONFIGURATION, configuration, env) and
                 match_env(PLATFORM, platform, env)
             )
 
         # We expect a well-formed csproj file to contain:
-        #   a single Project node directly under root
+        #   a Project node as its root
         #   (hopefully) an xmlns attribute matching the msbuild ns
-        if len(root.childNodes) > 1:
-            return ProjectLoadIncompatible([self.project_id])
-        project_elem = root.childNodes[0]
-        if project_elem.tagName != "Project":
+        namespace, tag_name = _split_tag(root.tag)
+        if tag_name != "Project":
             return ProjectLoadIncompatible([self.project_id])
-        if (
-                not project_elem.hasAttribute("xmlns") or
-                project_elem.getAttribute("xmlns") != self._PROJECT_XMLNS
-        ):
+        if namespace != self._PROJECT_XMLNS:
             from sys import stderr
             print(f"Warning: project missing xmlns: {self.project_id}", file=stderr)
 
@@ -364,67 +412,62 @@ class Project:
         if PLATFORM in registry_config:
             self._props[PLATFORM] = registry_config[PLATFORM]
 
-        for prop_group in root.getElementsByTagName("PropertyGroup"):
+        for prop_group in root.iter(_tag_prefix(root) + "PropertyGroup"):
 
             if not match_condition(prop_group, self._props):
                 continue
 
-            for child in prop_group.childNodes:
-                if child.nodeType == xml.Node.ELEMENT_NODE:
-                    match child.tagName:
-                        case const.CONFIGURATION:
-                            # pick up new configuration values
-                            if match_condition(child, self._props):
-                                self._props[CONFIGURATION] = _get_xml_text(
-                                    child
-                                )
-                        case const.PLATFORM:
-                            if match_condition(child, self._props):
-                                self._props[PLATFORM] = _get_xml_text(child)
-                        case None:
-                            # hopefully this isn't reachable...
-                            assert False
-                        case tag_name:
-                            self._props[tag_name] = _get_xml_text(child)
+            for child in prop_group:
+                match _local_name(child.tag):
+                    case const.CONFIGURATION:
+                        # pick up new configuration values
+                        if match_condition(child, self._props):
+                            self._props[CONFIGURATION] = _get_xml_text(child)
+                    case const.PLATFORM:
+                        if match_condition(child, self._props):
+                            self._props[PLATFORM] = _get_xml_text(child)
+                    case tag_name:
+                        self._props[tag_name] = _get_xml_text(child)
 
         return ProjectLoadOk(None)
 
 
 
     # def _find_import(self, root: xml.Element) -> Option[ProjectId]:
-    #     if not root.hasAttribute("Project"):
+    #     if root.get("Project") is None:
     #         return None
-    #     path = self._normalize_relpath(root.getAttribute("Project"))
+    #     path = self._normalize_relpath(root.get("Project"))
     #     name = path.name
 
     # def _find_imports(self, root: xml.Element): Iterable[ProjectId]
-    #     for import_ref in root.getElementsByTagName("Import"):
+    #     for import_ref in root.iter(_tag_prefix(root) + "Import"):
     #         self._load_import_ref(import_ref)
     #         if project_id is not None:
     #             yield project_id
 
     def _load(self, registry: "ProjectRegistry") -> ProjectLoadResult[Self]:
-        with xml.parse(str(self._project_id.path)) as root:
-            match self._load_props(registry, root):
-                case ProjectLoadDangling(backtrace):
-                    return ProjectLoadDangling(backtrace)
-                case ProjectLoadCycle(backtrace):
-                    return ProjectLoadCycle(backtrace)
-                case ProjectLoadIncompatible(backtrace):
-                    return ProjectLoadIncompatible(backtrace)
-                case ProjectLoadOk(_):
-                    pass
-            self._load_assembly_refs(root)
-            match self._load_project_refs(registry, root):
-                case ProjectLoadDangling(backtrace):
-                    return ProjectLoadDangling(backtrace)
-                case ProjectLoadCycle(backtrace):
-                    return ProjectLoadCycle(backtrace)
-                case ProjectLoadIncompatible(backtrace):
-                    return ProjectLoadIncompatible(backtrace)
-                case ProjectLoadOk(_):
-                    pass
-            self._load_source_refs(root)
+        path = str(self._project_id.path)
+        root = _parse_xml(path, os.stat(path).st_mtime_ns)
+        match self._load_props(registry, root):
+            case ProjectLoadDangling(backtrace):
+                return ProjectLoadDangling(backtrace)
+            case ProjectLoadCycle(backtrace):
+                return ProjectLoadCycle(backtrace)
+            case ProjectLoadIncompatible(backtrace):
+                return ProjectLoadIncompatible(backtrace)
+            case ProjectLoadOk(_):
+                pass
+        self._load_assembly_refs(registry, root)
+        match self._load_project_refs(registry, root):
+            case ProjectLoadDangling(backtrace):
+                return ProjectLoadDangling(backtrace)
+            case ProjectLoadCycle(backtrace):
+                return ProjectLoadCycle(backtrace)
+            case ProjectLoadIncompatible(backtrace):
+                return ProjectLoadIncompatible(backtrace)
+            case ProjectLoadOk(_):
+                pass
+        self._load_source_refs(registry, root)
         return ProjectLoadOk(self)
 
 
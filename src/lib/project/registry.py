@@ -1,8 +1,10 @@
 from collections.abc import Iterable
+from pathlib import Path
 from typing import Optional
 
+from .. import util
 from ..data_view import MapView, SetView
-from ..id import ProjectId
+from ..id import Guid, ProjectId
 
 from .project import (
     Project,
@@ -11,55 +13,113 @@ from .project import (
 )
 
 
+# project states
+_COMPLETE = 0
+_DANGLING = 1
+_INCOMPATIBLE = 2
+_LOADING = 3
+
+
 class ProjectRegistry:
 
+    __slots__ = (
+        "_project_complete", "_project_dangling", "_project_incompatible",
+        "_project_state", "_project_config",
+        "_relpath_cache", "_guid_cache"
+    )
+
     _project_complete: dict[ProjectId, Project]
     _project_dangling: set[ProjectId]
     _project_incompatible: set[ProjectId]
-    _project_loading: set[ProjectId]
+    # every known project's state, so a load needs a single lookup; the
+    # containers above back the public views
+    _project_state: dict[ProjectId, int]
     _project_config: dict[str, str]
 
+    # Sibling projects share relative includes (..\Common\..., packages\...)
+    # and reference the same project guids, so both are resolved once.
+    _relpath_cache: dict[tuple[Path, str], Path]
+    _guid_cache: dict[str, Guid]
+
     def __init__(self, config: Optional[Iterable[tuple[str, str]]] = None):
         self._project_complete = dict()
         self._project_dangling = set()
         self._project_incompatible = set()
-        self._project_loading = set()
+        self._project_state = dict()
         self._project_config = dict() if config is None else dict(config)
+        self._relpath_cache = dict()
+        self._guid_cache = dict()
 
     def load(self, project_id: ProjectId) -> ProjectLoadResult[Project]:
 
-        if project_id in self._project_complete:
-            return ProjectLoadOk(self._project_complete[project_id])
-        if project_id in self._project_dangling:
-            return ProjectLoadDangling([project_id])
-        if project_id in self._project_incompatible:
-            return ProjectLoadIncompatible([project_id])
-        if project_id in self._project_loading:
+        state = self._project_state.get(project_id)
+        if state is not None:
+            if state == _COMPLETE:
+                return ProjectLoadOk(self._project_complete[project_id])
+            if state == _DANGLING:
+                return ProjectLoadDangling([project_id])
+            if state == _INCOMPATIBLE:
+                return ProjectLoadIncompatible([project_id])
             return ProjectLoadCycle([project_id])
 
-        self._project_loading.add(project_id)
+        self._project_state[project_id] = _LOADING
 
         try:
             result = Project.load(self, project_id)
         finally:
-            self._project_loading.remove(project_id)
+            del self._project_state[project_id]
 
+        return self._record(project_id, result)
+
+    def preload(
+            self,
+            results: Iterable[tuple[ProjectId, ProjectLoadResult[Project]]]
+    ):
+        # Accepts projects parsed elsewhere (e.g. in worker processes) so that
+        # later loads of them are plain lookups.
+        for project_id, result in results:
+            if project_id not in self._project_state:
+                self._record(project_id, result)
+
+    def _record(
+            self,
+            project_id: ProjectId,
+            result: ProjectLoadResult[Project]
+    ) -> ProjectLoadResult[Project]:
         match result:
             case ProjectLoadOk(project):
                 self._project_complete[project_id] = project
+                self._project_state[project_id] = _COMPLETE
                 return ProjectLoadOk(project)
             case ProjectLoadDangling(backtrace):
                 self._project_dangling.add(project_id)
+                self._project_state[project_id] = _DANGLING
                 backtrace.append(project_id)
                 return ProjectLoadDangling(backtrace)
             case ProjectLoadIncompatible(backtrace):
                 self._project_incompatible.add(project_id)
+                self._project_state[project_id] = _INCOMPATIBLE
                 backtrace.append(project_id)
                 return ProjectLoadIncompatible(backtrace)
             case ProjectLoadCycle(backtrace):
                 backtrace.append(project_id)
                 return ProjectLoadCycle(backtrace)
 
+    def normalize_relpath(self, context: Path, path: str) -> Path:
+        key = (context, path)
+        repo_path = self._relpath_cache.get(key)
+        if repo_path is None:
+            repo_path = util.normalize_windows_relpath(context, path)
+            self._relpath_cache[key] = repo_path
+        return repo_path
+
+    def make_guid(self, raw: str) -> Guid:
+        guid = self._guid_cache.get(raw)
+        if guid is None:
+            guid = Guid(raw)
+            self._guid_cache[raw] = guid
+        return guid
+
     def config(self) -> MapView[str, str]:
         return MapView(self._project_config)
 
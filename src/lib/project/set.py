@@ -1,36 +1,61 @@
+import os
+
 from collections.abc import KeysView, Iterable
+from pathlib import Path
 from typing import Optional
 from ..id import AssemblyId, ProjectId, SourceId
 from ..data_view import MapView, SetView
 from ..multimap import MultiMap, MultiMapView
 from .project import (
     Project,
+    ProjectLoadResult,
     ProjectLoadOk, ProjectLoadDangling, ProjectLoadIncompatible, ProjectLoadCycle,
 )
 from .registry import ProjectRegistry
 
 class ProjectSet:
 
+    __slots__ = (
+        "_registry",
+        "_project_parents",
+        "_project_cyclic", "_assembly_dangling", "_source_dangling",
+        "_outputs_by_project", "_projects_by_output",
+        "_projects_sans_output", "_duplicate_outputs",
+        "_visited",
+        "_dir_entries", "_path_exists_cache",
+        "_project_parents_view",
+        "_assembly_dangling_view", "_source_dangling_view"
+    )
+
     _registry: ProjectRegistry
 
     _project_parents: MultiMap[ProjectId, ProjectId]
-    _project_outputs: dict[ProjectId, AssemblyId]
 
     _project_cyclic: set[ProjectId]
     _assembly_dangling: MultiMap[ProjectId, AssemblyId]
     _source_dangling: MultiMap[ProjectId, SourceId]
 
-    _output_by_project: dict[ProjectId, AssemblyId]
-    _project_by_output: dict[AssemblyId, ProjectId]
+    _outputs_by_project: dict[ProjectId, AssemblyId]
+    _projects_by_output: dict[AssemblyId, ProjectId]
     _projects_sans_output: set[ProjectId]
     _duplicate_outputs: MultiMap[AssemblyId, ProjectId]
 
+    # every project ever queued by add()
+    _visited: set[ProjectId]
+
+    _dir_entries: dict[Path, frozenset[str]]
+    _path_exists_cache: dict[Path, bool]
+
+    # The containers above are never rebound, so their views are made once.
+    _project_parents_view: MultiMapView[ProjectId, ProjectId]
+    _assembly_dangling_view: MultiMapView[ProjectId, AssemblyId]
+    _source_dangling_view: MultiMapView[ProjectId, SourceId]
+
     def __init__(self, config: Optional[Iterable[tuple[str, str]]] = None):
 
         self._registry = ProjectRegistry(config)
 
         self._project_parents = MultiMap()
-        self._project_outputs = dict()
 
         self._project_cyclic = set()
         self._assembly_dangling = MultiMap()
@@ -41,28 +66,70 @@ class ProjectSet:
         self._projects_sans_output = set()
         self._duplicate_outputs = MultiMap()
 
-    def add(self, project_id: ProjectId):
-        project_ids = [project_id]
-        while len(project_ids) > 0:
-            project_id = project_ids.pop()
-            if (
-                    project_id in self._registry.complete() or
-                    project_id in self._registry.dangling() or
-                    project_id in self._registry.incompatible() or
-                    project_id in self._project_cyclic
-            ):
-                continue
+        self._visited = set()
+
+        self._dir_entries = dict()
+        self._path_exists_cache = dict()
+
+        self._project_parents_view = MultiMapView(self._project_parents)
+        self._assembly_dangling_view = MultiMapView(self._assembly_dangling)
+        self._source_dangling_view = MultiMapView(self._source_dangling)
+
+    def _path_exists(self, path: Path) -> bool:
+        # The same assembly is usually referenced by many projects.
+        exists = self._path_exists_cache.get(path)
+        if exists is None:
+            exists = self._check_path_exists(path)
+            self._path_exists_cache[path] = exists
+        return exists
+
+    def _check_path_exists(self, path: Path) -> bool:
+        # References cluster in a handful of bin/lib/packages directories, so
+        # we list each directory once instead of stat()ing every file in it.
+        parent = path.parent
+        names = self._dir_entries.get(parent)
+        if names is None:
+            try:
+                with os.scandir(parent) as entries:
+                    names = frozenset(entry.name for entry in entries)
+            except (FileNotFoundError, NotADirectoryError):
+                names = frozenset()
+            except OSError:
+                return path.exists()
+            self._dir_entries[parent] = names
+        # A miss may only differ by case on a case-insensitive filesystem.
+        return path.name in names or path.exists()
 
+    def add(self, project_id: ProjectId):
+        self.add_many((project_id,))
+
+    def add_many(self, project_ids: Iterable[ProjectId]):
+        # Every queued project is loaded before the walk ends, so one set
+        # stands in for the complete/dangling/incompatible/cyclic checks.
+        visited = self._visited
+        unvisited = set(project_ids)
+        unvisited -= visited
+        visited |= unvisited
+        queue = list(unvisited)
+        add_parent = self._project_parents.add
+        extend = queue.extend
+        pop = queue.pop
+        while queue:
+            project_id = pop()
             match self._registry.load(project_id):
                 case ProjectLoadOk(project):
-                    for subproject_id in project.project_refs():
-                        self._project_parents.add(subproject_id, project.project_id)
-                        project_ids.append(subproject_id)
+                    subproject_ids = project.project_refs()
+                    for subproject_id in subproject_ids:
+                        add_parent(subproject_id, project_id)
+                    # queue the unvisited refs in bulk
+                    unvisited = subproject_ids - visited
+                    visited |= unvisited
+                    extend(unvisited)
                     for assembly_id in project.assembly_refs():
                         assembly_path = assembly_id.path
                         if (
                                 assembly_path is not None and
-                                not assembly_path.exists()
+                                not self._path_exists(assembly_path)
                         ):
                             self._assembly_dangling.add(project_id, assembly_id)
                     output = project.output()
@@ -83,6 +150,12 @@ class ProjectSet:
                 case ProjectLoadCycle(_):
                     self._project_cyclic.add(project_id)
 
+    def preload(
+            self,
+            results: Iterable[tuple[ProjectId, ProjectLoadResult[Project]]]
+    ):
+        self._registry.preload(results)
+
     def complete(self) -> MapView[ProjectId, Project]:
         return self._registry.complete()
 
@@ -93,7 +166,7 @@ class ProjectSet:
         return SetView(self._project_cyclic)
 
     def parents(self) -> MultiMapView[ProjectId, ProjectId]:
-        return MultiMapView(self._project_parents)
+        return self._project_parents_view
 
     def dangling_projects(self) -> SetView[ProjectId]:
         return self._registry.dangling()
@@ -101,12 +174,12 @@ class ProjectSet:
     def dangling_assemblies(
             self
     ) -> MultiMapView[ProjectId, AssemblyId]:
-        return MultiMapView(self._assembly_dangling)
+        return self._assembly_dangling_view
 
     def dangling_sources(
             self
     ) -> MultiMapView[ProjectId, SourceId]:
-        return MultiMapView(self._source_dangling)
+        return self._source_dangling_view
 
     def outputs(self) -> KeysView[AssemblyId]:
         return self._projects_by_output.keys()
@@ -1,44 +1,210 @@
-import enum
 import re
 
-from enum import Enum
-from collections.abc import (
-    Iterable, Iterator,
-    MutableMapping, MutableSet,
-    Mapping, Set,
-    KeysView, ValuesView
-)
+from collections import deque
+from collections.abc import ValuesView
 from pathlib import Path
-from typing import Generic, Optional, TypeVar
 
 from . import util
-from .id import AssemblyId, Guid, ProjectId, ProjectId, SourceId
-from .data_view import MapView, SetView
-from .multimap import (
-    MultiMap, MultiMapView, MultiMapItemsView, MultiMapValuesView
-)
-from .project import (
-    Project,
-    ProjectLoadOk, ProjectLoadDangling, ProjectLoadIncompatible, ProjectLoadCycle,
-    ProjectLoadResult,
-    ProjectSet
-)
+from .id import AssemblyId, Guid, ProjectId, SourceId
+from .data_view import SetView
+from .multimap import MultiMap, MultiMapView
+from .project import Project, ProjectSet
 
 
 def _build_parse_project_regexp():
-    prefix = r'.*Project[^=]*=\s*'
-    name = r'"(?P<name>[^"]*)"\s*'
-    path = r'"(?P<path>[^"]*\.csproj)"\s*'
-    guid = r'"\{(?P<guid>[^\}]*)\}"\s*'
-    sep = r',\s*'
-    return re.compile(''.join([prefix, name, sep, path, sep, guid]))
+    # The whole file is scanned at once, so no part of a match may cross a
+    # line break: whitespace is horizontal only and fields exclude newlines.
+    ws = r'[^\S\n]*'
+    # project lines open with Project("{type guid}") = ..., maybe after a BOM
+    prefix = r'^(?:\xef\xbb\xbf)?' + ws + r'Project\([^)\n]*\)' + ws + '=' + ws
+    name = r'"(?P<name>[^"\n]*)"' + ws
+    path = r'"(?P<path>[^"\n]*\.csproj)"' + ws
+    guid = r'"\{(?P<guid>[^}\n]*)\}"'
+    sep = r',' + ws
+    # matched against raw bytes: only the captured fields get decoded
+    source = ''.join([prefix, name, sep, path, sep, guid])
+    return re.compile(source.encode("ascii"), re.MULTILINE)
+
+
+_PARSE_PROJECT_REGEXP = _build_parse_project_regexp()
+
+
+# topsort marks
+_WHITE = 0
+_GREY = 1
+_BLACK = 2
+
+
+def _topsort_indices(
+        roots: list[int],
+        refs: list[tuple[int, ...]]
+) -> tuple[bool, list[int]]:
+
+    marks = bytearray(len(refs))
+    output: list[int] = []
+
+    # Each frame pairs a GREY node with the position of its next ref.
+    stack: list[list[int]] = []
+
+    for root in roots:
+        if marks[root] != _WHITE:
+            continue
+        marks[root] = _GREY
+        stack.append([root, 0])
+        while stack:
+            frame = stack[-1]
+            node, pos = frame
+            node_refs = refs[node]
+            if pos >= len(node_refs):
+                stack.pop()
+                marks[node] = _BLACK
+                output.append(node)
+                continue
+            frame[1] = pos + 1
+            subnode = node_refs[pos]
+            mark = marks[subnode]
+            if mark == _GREY:
+                # the stack holds the path from the root to the cycle
+                cycle = [entry[0] for entry in stack]
+                cycle.append(subnode)
+                return (False, cycle)
+            if mark == _WHITE:
+                marks[subnode] = _GREY
+                stack.append([subnode, 0])
+
+    output.reverse()
+    return (True, output)
+
+
+def _strongly_connected_indices(
+        refs: list[tuple[int, ...]]
+) -> list[list[int]]:
+
+    # Tarjan's algorithm, iteratively: components come out sinks first.
+    count = len(refs)
+    order = [-1] * count
+    lowlink = [0] * count
+    on_stack = bytearray(count)
+    stack: list[int] = []
+    components: list[list[int]] = []
+    counter = 0
+
+    # Each frame pairs a node with the position of its next ref.
+    frames: list[list[int]] = []
+
+    for root in range(count):
+        if order[root] >= 0:
+            continue
+        order[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        frames.append([root, 0])
+        while frames:
+            frame = frames[-1]
+            node, pos = frame
+            node_refs = refs[node]
+            if pos < len(node_refs):
+                frame[1] = pos + 1
+                subnode = node_refs[pos]
+                if order[subnode] < 0:
+                    order[subnode] = lowlink[subnode] = counter
+                    counter += 1
+                    stack.append(subnode)
+                    on_stack[subnode] = 1
+                    frames.append([subnode, 0])
+                elif on_stack[subnode] and order[subnode] < lowlink[node]:
+                    lowlink[node] = order[subnode]
+                continue
+            frames.pop()
+            if frames:
+                parent = frames[-1][0]
+                if lowlink[node] < lowlink[parent]:
+                    lowlink[parent] = lowlink[node]
+            if lowlink[node] == order[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+def _path_indices(
+        source: int,
+        target: int,
+        members: set[int],
+        refs: list[tuple[int, ...]]
+) -> list[int]:
+
+    # Shortest path from source to target that stays inside members, by
+    # breadth first search. The result leaves out source but ends in target,
+    # so a path from a node back to itself is at least one step long.
+    parents: dict[int, int] = dict()
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for subnode in refs[node]:
+            if subnode not in members or subnode in parents:
+                continue
+            parents[subnode] = node
+            if subnode == target:
+                path = [target]
+                while node != source:
+                    path.append(node)
+                    node = parents[node]
+                path.reverse()
+                return path
+            queue.append(subnode)
+    raise ValueError(f"no path from {source} to {target}")
+
+
+def _closed_walk_indices(
+        component: list[int],
+        refs: list[tuple[int, ...]]
+) -> list[int]:
+
+    # A component need not lie on one simple cycle (A <-> B, A <-> C), so
+    # chain shortest paths from each member to the next one not yet visited
+    # and back to the start. Members may repeat; each refs the next, and the
+    # last refs the first.
+    members = set(component)
+    start = component[0]
+    walk = [start]
+    visited = {start}
+    node = start
+    for target in component[1:]:
+        if target in visited:
+            continue
+        path = _path_indices(node, target, members, refs)
+        walk.extend(path)
+        visited.update(path)
+        node = target
+    # the closing path ends back at start, which already opens the walk
+    walk.extend(_path_indices(node, start, members, refs)[:-1])
+    return walk
 
 
 class Solution:
 
     # TODO: track the source of the broken stuff
 
+    __slots__ = (
+        "_path", "_solution_dir", "_project_set",
+        "_project_guids", "_project_roots",
+        "_project_undeclared", "_duplicate_guids",
+        "_relpath_cache", "_guid_cache",
+        "_project_index", "_project_ids", "_project_adjacency",
+        "_project_roots_view", "_project_undeclared_view",
+        "_duplicate_guids_view"
+    )
+
     _path: Path
+    _solution_dir: Path
     _project_set: ProjectSet
 
     _project_guids: MultiMap[ProjectId, Guid]
@@ -46,11 +212,23 @@ class Solution:
     _project_undeclared: MultiMap[ProjectId, ProjectId]
     _duplicate_guids: MultiMap[Guid, ProjectId]
 
-    _PARSE_PROJECT_REGEXP = _build_parse_project_regexp()
+    _relpath_cache: dict[str, Path]
+    _guid_cache: dict[str, Guid]
+
+    # dense numbering of every loaded project, for the graph walks
+    _project_index: dict[ProjectId, int]
+    _project_ids: list[ProjectId]
+    _project_adjacency: list[tuple[int, ...]]
+
+    # The containers above are never rebound, so their views are made once.
+    _project_roots_view: SetView[ProjectId]
+    _project_undeclared_view: MultiMapView[ProjectId, ProjectId]
+    _duplicate_guids_view: MultiMapView[Guid, ProjectId]
 
     def __init__(self, path: str | Path):
 
         self._path = util.normalize_windows_path(path)
+        self._solution_dir = self._path.parent
         self._project_set = ProjectSet()
 
         self._project_guids = MultiMap()
@@ -58,98 +236,119 @@ class Solution:
         self._project_undeclared = MultiMap()
         self._duplicate_guids = MultiMap()
 
+        self._relpath_cache = dict()
+        self._guid_cache = dict()
+
+        self._project_index = dict()
+        self._project_ids = list()
+        self._project_adjacency = list()
+
+        self._project_roots_view = SetView(self._project_roots)
+        self._project_undeclared_view = MultiMapView(self._project_undeclared)
+        self._duplicate_guids_view = MultiMapView(self._duplicate_guids)
+
         self._load()
 
-    def _parse_project(self, line) -> Optional[tuple[Guid, ProjectId]]:
+    def _parse_project(self, match: re.Match[bytes]) -> tuple[Guid, ProjectId]:
+
+        # the pattern captures exactly name, path and guid, in that order
+        (raw_name, raw_path, raw_guid) = match.groups()
+        name = raw_name.decode("utf-8", "replace")
+        path = raw_path.decode("utf-8", "replace")
+        guid = raw_guid.decode("utf-8", "replace")
 
-        match = self._PARSE_PROJECT_REGEXP.match(line)
-        if match is None:
-            return None
-        name = match.group("name")
-        path = match.group("path")
-        guid = match.group("guid")
+        repo_path = self._relpath_cache.get(path)
+        if repo_path is None:
+            repo_path = util.normalize_windows_relpath(self._solution_dir, path)
+            self._relpath_cache[path] = repo_path
 
-        repo_path = util.normalize_windows_relpath(self.path.parent, path)
+        guid_id = self._guid_cache.get(guid)
+        if guid_id is None:
+            guid_id = Guid(guid)
+            self._guid_cache[guid] = guid_id
 
-        return (Guid(guid), ProjectId(name, repo_path))
+        return (guid_id, ProjectId(name, repo_path))
 
     def _load_projects(self):
-        for project in self._project_roots:
-            self._project_set.add(project)
+        self._project_set.add_many(self._project_roots)
 
     def _load_roots(self):
-        with open(self._path, "r") as file:
-            for line in file.readlines():
-                result = self._parse_project(line)
-                if result is not None:
-                    guid, project_id = result
-                    self._project_guids.add(project_id, guid)
-                    self._project_roots.add(project_id)
+        # One regex pass over the whole file instead of a match per line.
+        data = self._path.read_bytes()
+        parsed = [
+            self._parse_project(match)
+            for match in _PARSE_PROJECT_REGEXP.finditer(data)
+        ]
+        self._project_roots.update(project_id for _, project_id in parsed)
+        # a project may be declared under more than one guid
+        add_guid = self._project_guids.add
+        for guid, project_id in parsed:
+            add_guid(project_id, guid)
 
     def topsort(self) -> tuple[bool, list[ProjectId]]:
 
-        class Mark(Enum):
-            WHITE = 0
-            GREY = enum.auto()
-            BLACK = enum.auto()
-
-        marks: dict[ProjectId, Mark] = dict()
-        output = []
-
-        complete = self._project_set.complete()
-        dangling = self._project_set.dangling_projects()
-        incompatible = self._project_set.incompatible()
-        cyclic = self._project_set.cyclic()
-
-        def visit(project_id: ProjectId) -> Optional[list[ProjectId]]:
-            match marks.get(project_id, Mark.WHITE):
-                case Mark.GREY:
-                    return [project_id]
-                case Mark.BLACK:
-                    return None
-            if project_id in dangling or project_id in incompatible:
-                marks[project_id] = Mark.BLACK
-                output.append(project_id)
-                return None
-            marks[project_id] = Mark.GREY
-            project = complete[project_id]
-            for subproject_id in project.project_refs():
-                result = visit(subproject_id)
-                if result is not None:
-                    result.append(project_id)
-                    return result
-            marks[project_id] = Mark.BLACK
-            output.append(project_id)
-            return None
-
-        for root_id in self._project_roots:
-            result = visit(root_id)
-            if result is not None:
-                result.append(root_id)
-                result.reverse()
-                return (False, result)
-
-        output.reverse()
-        return (True, output)
+        index = self._project_index
+        roots = [index[root_id] for root_id in self._project_roots]
+        ok, order = _topsort_indices(roots, self._project_adjacency)
+        ids = self._project_ids
+        return (ok, [ids[i] for i in order])
+
+    def dependency_cycles(self) -> list[list[ProjectId]]:
+
+        # One closed walk through each cyclic strongly connected component,
+        # where topsort stops at the first cycle it meets.
+        adjacency = self._project_adjacency
+        ids = self._project_ids
+        cycles = []
+        for component in _strongly_connected_indices(adjacency):
+            if len(component) > 1 or component[0] in adjacency[component[0]]:
+                # members pop off Tarjan's stack newest first
+                component.reverse()
+                walk = _closed_walk_indices(component, adjacency)
+                cycles.append([ids[i] for i in walk])
+        return cycles
 
     def _scan_projects(self) -> None:
         guid_map: dict[Guid, ProjectId] = dict()
+        duplicates: dict[Guid, set[ProjectId]] = dict()
+        roots = self._project_roots
+        add_undeclared = self._project_undeclared.add
         for project_id, project in self._project_set.complete().items():
             for (subproject_id, guids) in project.project_ref_guids().items():
-                if subproject_id not in self._project_roots:
-                    self._project_undeclared.add(project_id, subproject_id)
+                if subproject_id not in roots:
+                    add_undeclared(project_id, subproject_id)
                 for guid in guids:
-                    if guid in guid_map:
-                        other_id = guid_map[guid]
+                    other_id = guid_map.get(guid)
+                    if other_id is not None:
                         if other_id != subproject_id:
-                            self._duplicate_guids.add(guid, other_id)
-                            self._duplicate_guids.add(guid, subproject_id)
+                            duplicates.setdefault(guid, set()).update(
+                                (other_id, subproject_id)
+                            )
                     else:
                         guid_map[guid] = subproject_id
+        for guid, project_ids in duplicates.items():
+            self._duplicate_guids.extend(guid, project_ids)
+
+    def _index_projects(self):
+        ids = self._project_ids
+        ids.extend(self._project_set.complete().keys())
+        ids.extend(self._project_set.dangling_projects())
+        ids.extend(self._project_set.incompatible())
+        index = self._project_index
+        for i, project_id in enumerate(ids):
+            index[project_id] = i
+        # dangling and incompatible projects are numbered last, as leaves
+        adjacency = self._project_adjacency
+        for project in self._project_set.complete().values():
+            adjacency.append(tuple(
+                index[subproject_id] for subproject_id in project.project_refs()
+            ))
+        adjacency.extend(() for _ in range(len(ids) - len(adjacency)))
 
     def _load(self):
         self._load_roots()
         self._load_projects()
+        self._index_projects()
         self._scan_projects()
 
     @property
@@ -157,7 +356,7 @@ class Solution:
         return self._path
 
     def project_roots(self) -> SetView[ProjectId]:
-        return SetView(self._project_roots)
+        return self._project_roots_view
 
     def parents(self) -> MultiMapView[ProjectId, ProjectId]:
         return self._project_set.parents()
@@ -179,7 +378,7 @@ class Solution:
 
     @property
     def has_duplicate_guids(self) -> bool:
-       return len(self._duplicate_guids) > 0
+        return len(self._duplicate_guids) > 0
 
     @property
     def has_undeclared_projects(self) -> bool:
@@ -187,29 +386,29 @@ class Solution:
 
     @property
     def has_dangling_projects(self) -> bool:
-        return len(self.dangling_projects()) > 0
+        return len(self._project_set.dangling_projects()) > 0
 
     @property
     def has_dangling_assemblies(self) -> bool:
-        return len(self.dangling_assemblies()) > 0
+        return len(self._project_set.dangling_assemblies()) > 0
 
     @property
     def has_dangling_sources(self) -> bool:
-        return len(self.dangling_sources()) > 0
+        return len(self._project_set.dangling_sources()) > 0
 
     @property
     def has_incompatible_projects(self) -> bool:
-        return len(self.incompatible_projects()) > 0
+        return len(self._project_set.incompatible()) > 0
 
     @property
     def has_cyclic_projects(self) -> bool:
-        return len(self.cyclic_projects()) > 0
+        return len(self._project_set.cyclic()) > 0
 
     def duplicate_guids(self) -> MultiMapView[Guid, ProjectId]:
-        return MultiMapView(self._duplicate_guids)
+        return self._duplicate_guids_view
 
     def undeclared_projects(self) -> MultiMapView[ProjectId, ProjectId]:
-        return MultiMapView(self._project_undeclared)
+        return self._project_undeclared_view
 
     def dangling_projects(self) -> SetView[ProjectId]:
         return self._project_set.dangling_projects()
@@ -2,11 +2,23 @@ import os
 from pathlib import Path, PureWindowsPath
 
 
+def _is_plain_relpath(path: str) -> bool:
+    # no drive, UNC share or root: backslashes are the only Windows-ism
+    return ":" not in path and not path.startswith(("\\", "/"))
+
+
 def normalize_windows_path(path: str | Path) -> Path:
+    path = str(path)
+    if _is_plain_relpath(path):
+        return Path(os.path.normpath(path.replace("\\", "/")))
     return Path(os.path.normpath(Path(*PureWindowsPath(path).parts)))
 
 
 def normalize_windows_relpath(context: Path, path: str | Path) -> Path:
+    path = str(path)
+    if _is_plain_relpath(path):
+        joined = os.path.join(context, path.replace("\\", "/"))
+        return Path(os.path.normpath(joined))
     rel_path = PureWindowsPath(path)
     denorm_path = context.joinpath(rel_path)
     return Path(os.path.normpath(denorm_path))
@@ -35,20 +35,18 @@ class VarEnv(Generic[VarEnvName, VarEnvValue]):
 
     def __setitem__(self, name: VarEnvName, value: VarEnvValue):
         self._names.append(name)
-        if name in self._bindings:
-            values = self._bindings[name]
-        else:
+        values = self._bindings.get(name)
+        if values is None:
             values = []
             self._bindings[name] = values
         values.append(value)
 
     def names(self) -> Iterable[VarEnvName]:
-        for name in self._bindings:
-            yield name
+        return iter(self._bindings)
 
     def bindings(self) -> Iterable[tuple[VarEnvName, VarEnvValue]]:
-        for name in self._bindings:
-            yield (name, self[name])
+        for name, values in self._bindings.items():
+            yield (name, values[-1])
 
     def __enter__(self) -> "VarEnv":
         self._scopes.append(len(self._names))
@@ -56,9 +54,11 @@ class VarEnv(Generic[VarEnvName, VarEnvValue]):
 
     def __exit__(self, *_exc):
         name_count = self._scopes.pop()
-        while len(self._names) > name_count:
-            name = self._names.pop()
-            values = self._bindings[name]
+        # unbind the scope's names newest first, then drop them in one go
+        bindings = self._bindings
+        for name in reversed(self._names[name_count:]):
+            values = bindings[name]
             values.pop()
             if len(values) <= 0:
-                del self._bindings[name]
+                del bindings[name]
+        del self._names[name_count:]
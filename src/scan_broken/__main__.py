@@ -1,18 +1,22 @@
 import os
 import subprocess
+import sys
+
+from collections.abc import Iterator
 
 from .get_args import get_args
 from ..lib.solution import Solution
 
 
-def run_find(*args, **kwargs):
-    if "capture_output" not in kwargs:
-        kwargs["capture_output"] = True
-    if "check" not in kwargs:
-        kwargs["check"] = True
-    if "text" not in kwargs:
-        kwargs["text"] = True
-    return subprocess.run(["fd", *args], **kwargs)
+def run_find(*args) -> Iterator[str]:
+    # Yield paths as fd reports them, so work can begin before the search
+    # finishes and the full listing is never held in memory.
+    with subprocess.Popen(["fd", *args], stdout=subprocess.PIPE, text=True) as proc:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            yield line.rstrip("\r\n")
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args)
 
 
 def find_solutions(repo):
@@ -27,59 +31,73 @@ def find_solutions(repo):
 #     this means what? factory method? path -> many paths
 
 
+def report_lines(solution: Solution) -> list[str]:
+
+    # Everything wrong with one solution, or nothing if it is sound.
+    indent = "    "
+    cycles = solution.dependency_cycles()
+    if not solution.is_broken and len(cycles) == 0:
+        return []
+
+    lines: list[str] = []
+    emit = lines.append
+    emit(str(solution.path))
+    if len(cycles) > 0:
+        emit(indent + "dependency cycles:")
+        for cycle in cycles:
+            emit(indent * 2 + "cycle:")
+            for project_id in cycle:
+                emit(indent * 3 + str(project_id.path))
+    if solution.has_duplicate_guids:
+        emit(indent + "duplicate guids:")
+        for guid, project_ids in solution.duplicate_guids().items():
+            emit(indent * 2 + str(guid))
+            parent_map = solution.parents()
+            for project_id in project_ids:
+                emit(indent * 3 + str(project_id))
+                if project_id in parent_map:
+                    for parent in parent_map[project_id]:
+                        emit(indent * 4 + " " + str(parent.path))
+                else:
+                    emit(indent * 4 + " <root>")
+    if solution.has_undeclared_projects:
+        emit(indent + "undeclared projects:")
+        for project, project_ids in solution.undeclared_projects().items():
+            emit(indent * 2 + str(project.path))
+            for project_id in project_ids:
+                emit(indent * 3 + str(project_id.path))
+    if solution.has_dangling_projects:
+        emit(indent + "dangling projects:")
+        for project_id in solution.dangling_projects():
+            emit(indent * 2 + str(project_id.path))
+    if solution.has_dangling_assemblies:
+        emit(indent + "dangling assemblies:")
+        assemblies = solution.dangling_assemblies()
+        for project_id, assembly_ids in assemblies.items():
+            emit(indent * 2 + str(project_id.path))
+            for assembly_id in assembly_ids:
+                emit(indent * 3 + str(assembly_id.path))
+    if solution.has_dangling_sources:
+        emit(indent + "dangling_sources:")
+        sources = solution.dangling_sources()
+        for (project_id, source_ids) in sources.items():
+            emit(indent * 2 + str(project_id.path))
+            for source_id in source_ids:
+                emit(indent * 3 + str(source_id.path))
+    emit("")
+    return lines
+
+
 def main():
 
     config = get_args()
 
     os.chdir(config.repo)
-    for line in find_solutions(config.root).stdout.splitlines():
-
-        solution = Solution(line)
-        indent = "    "
-        acyclic, project_deps = solution.topsort()
-
-        if solution.is_broken or not acyclic:
-            print(solution.path)
-            if not acyclic:
-                print(indent + "dependency cycle:")
-                for project_dep in project_deps:
-                    print(indent * 2 + str(project_dep.path))
-            if solution.has_duplicate_guids:
-                print(indent + "duplicate guids:")
-                for guid, project_ids in solution.duplicate_guids().items():
-                    print(indent * 2 + str(guid))
-                    parent_map = solution.parents()
-                    for project_id in project_ids:
-                        print(indent * 3 + str(project_id))
-                        if project_id in parent_map:
-                            for parent in parent_map[project_id]:
-                                print(indent * 4, str(parent.path))
-                        else:
-                            print(indent * 4, "<root>")
-            if solution.has_undeclared_projects:
-                print(indent + "undeclared projects:")
-                for project, project_ids in solution.undeclared_projects().items():
-                    print(indent * 2 + str(project.path))
-                    for project_id in project_ids:
-                        print(indent * 3 + str(project_id.path))
-            if solution.has_dangling_projects:
-                print(indent + "dangling projects:")
-                for project_id in solution.dangling_projects():
-                    print(indent * 2 + str(project_id.path))
-            if solution.has_dangling_assemblies:
-                print(indent + "dangling assemblies:")
-                assemblies = solution.dangling_assemblies()
-                for project_id, assembly_ids in assemblies.items():
-                    print(indent * 2 + str(project_id.path))
-                    for assembly_id in assembly_ids:
-                        print(indent * 3 + str(assembly_id.path))
-            if solution.has_dangling_sources:
-                print(indent + "dangling_sources:")
-                sources = solution.dangling_sources()
-                for (project_id, source_ids) in sources.items():
-                    print(indent * 2 + str(project_id.path))
-                    for source_id in source_ids:
-                        print(indent * 3 + str(source_id.path))
+    for line in find_solutions(config.root):
+        # collect the whole report and write it at once
+        lines = report_lines(Solution(line))
+        if len(lines) > 0:
+            sys.stdout.write("\n".join(lines))
 
 
 if __name__ == "__main__":
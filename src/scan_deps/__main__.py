@@ -1,10 +1,14 @@
 import os
 import subprocess
+import sys
 
+from collections import deque
+from collections.abc import Iterator
 from typing import Optional
 
 from .get_args import get_args, Config
-from ..lib.id import ProjectId
+from .preload import preload_projects
+from ..lib.id import AssemblyId, ProjectId
 from ..lib.multimap import MultiMap
 from ..lib.project import (
     CONFIGURATION, PLATFORM,
@@ -16,91 +20,94 @@ from ..lib.project import (
 from ..lib import util
 
 
-def run_find(*args, **kwargs):
-    if "capture_output" not in kwargs:
-        kwargs["capture_output"] = True
-    if "check" not in kwargs:
-        kwargs["check"] = True
-    if "text" not in kwargs:
-        kwargs["text"] = True
-    return subprocess.run(["fd", *args], **kwargs)
+def run_find(*args) -> Iterator[str]:
+    # Yield paths as fd reports them, so work can begin before the search
+    # finishes and the full listing is never held in memory.
+    with subprocess.Popen(["fd", *args], stdout=subprocess.PIPE, text=True) as proc:
+        assert proc.stdout is not None
+        for line in proc.stdout:
+            yield line.rstrip("\r\n")
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args)
 
 
 def find_projects(repo):
     return run_find("\\.csproj$", str(repo))
 
-def create_project_set(prog_config: Config) -> ProjectSet:
+def create_config(prog_config: Config) -> dict[str, str]:
     config = dict()
     if prog_config.configuration is not None:
         config[CONFIGURATION] = prog_config.configuration.value
     if prog_config.platform is not None:
         config[PLATFORM] = prog_config.platform.value
-    return ProjectSet(config.items())
+    return config
 
-def compute_build_order(project_set: ProjectSet):
+def create_project_set(prog_config: Config) -> ProjectSet:
+    return ProjectSet(create_config(prog_config).items())
 
-    projects = project_set.complete()
-    projects_by_output = project_set.projects_by_output()
-    projects_by_output_name = MultiMap()
-    for assembly_id, project_id in projects_by_output.items():
+def group_by_output_name(project_set: ProjectSet) -> MultiMap[str, ProjectId]:
+    projects_by_output_name: MultiMap[str, ProjectId] = MultiMap()
+    for assembly_id, project_id in project_set.projects_by_output().items():
         projects_by_output_name.add(assembly_id.name, project_id)
+    return projects_by_output_name
 
-    build_order = []
-    complete = set()
-    scanning = set()
+def compute_build_order(
+        project_set: ProjectSet,
+        projects_by_output_name: Optional[MultiMap[str, ProjectId]] = None
+) -> list[ProjectId]:
 
-    def mark_complete(project_id):
-        complete.add(project_id)
+    projects = project_set.complete()
+    if projects_by_output_name is None:
+        projects_by_output_name = group_by_output_name(project_set)
+
+    # Pick a producer for each assembly name once, up front.
+    # .. maybe we can get away without having to choose
+    # we cannot. just pick one for now I guess.
+    producers = {
+        assembly_name: next(iter(project_ids))
+        for assembly_name, project_ids in projects_by_output_name.items()
+    }
+
+    # Resolve every project's dependencies up front, counting how many each
+    # one waits on and recording who waits on it. We'll pretend projects we
+    # couldn't load are complete: they wait on nothing.
+    dependents: dict[ProjectId, list[ProjectId]] = dict()
+    waiting: dict[ProjectId, int] = dict()
+    for project_id, project in projects.items():
+        dependencies = set(project.project_refs())
+        for assembly_id in project.assembly_refs():
+            # look for a project producing an assembly with the required name
+            producer_id = producers.get(assembly_id.name)
+            if producer_id is not None:
+                dependencies.add(producer_id)
+        waiting[project_id] = len(dependencies)
+        for subproject_id in dependencies:
+            dependents.setdefault(subproject_id, []).append(project_id)
+            waiting.setdefault(subproject_id, 0)
+
+    # Kahn's algorithm: a project is ready once everything it needs is built.
+    ready = deque(
+        project_id for project_id, count in waiting.items() if count == 0
+    )
+    build_order = []
+    while ready:
+        project_id = ready.popleft()
         build_order.append(project_id)
-
-    def visit(project_id: ProjectId) -> Optional[list[ProjectId]]:
-
-        if project_id in complete:
-            return None  # already done
-        if project_id in scanning:
-            return [project_id]  # dependency cycle
-
-        # we'll pretend projects we couldn't load are complete
-        if project_id in projects:
-            scanning.add(project_id)
-            try:
-                project = projects[project_id]
-
-                # recurse on project refs
-                for subproject_id in project.project_refs():
-                    result = visit(subproject_id)
-                    if result is not None:  # dependency cycle
-                        result.append(project_id)
-                        return result
-
-                # recurse on assembly refs
-                for assembly_id in project.assembly_refs():
-                    # look for a project producing an assembly with the required name
-                    if assembly_id.name in projects_by_output_name:
-                        # .. maybe we can get away without having to choose
-                        # we cannot. just pick one for now I guess.
-                        subproject_ids = projects_by_output_name[assembly_id.name]
-                        subproject_id = next(iter(subproject_ids))
-                        result = visit(subproject_id)
-                        if result is not None:  # dependency cycle
-                            result.append(project_id)
-                            return result
-
-            finally:
-                scanning.remove(project_id)
-
-        mark_complete(project_id)
-        return None
-
-    for project_id in projects:
-        result = visit(project_id)
-        if result is not None:
-            raise RuntimeError(
-                "\n  ".join(["Dependency cycle", *map(str, result)])
-            )
-
-    result.reverse()
-    return result
+        for dependent_id in dependents.get(project_id, ()):
+            waiting[dependent_id] -= 1
+            if waiting[dependent_id] == 0:
+                ready.append(dependent_id)
+
+    if len(build_order) < len(waiting):
+        # whatever never became ready is on, or behind, a dependency cycle
+        stuck = [
+            project_id for project_id, count in waiting.items() if count > 0
+        ]
+        raise RuntimeError(
+            "\n  ".join(["Dependency cycle", *map(str, stuck)])
+        )
+
+    return build_order
 
 def main():
 
@@ -109,25 +116,33 @@ def main():
 
     os.chdir(prog_config.repo)
 
-    for line in find_projects(prog_config.root).stdout.splitlines():
-        path = util.normalize_windows_path(line)
-        name = path.stem
-        project_id = ProjectId(name, path)
-        pset.add(project_id)
+    project_ids: list[ProjectId] = []
+    append = project_ids.append
+    normalize = util.normalize_windows_path
+    for line in find_projects(prog_config.root):
+        path = normalize(line)
+        append(ProjectId(path.stem, path))
+
+    preload_projects(pset, create_config(prog_config), project_ids)
+    pset.add_many(project_ids)
+
+    # collect the whole report and write it at once
+    lines: list[str] = []
+    emit = lines.append
 
     projects_without_output = pset.projects_without_output()
     if len(projects_without_output) > 0:
-        print("Projects without (guessable) output:")
+        emit("Projects without (guessable) output:")
         for id in projects_without_output:
-            print("  ", str(id.path))
+            emit("   " + str(id.path))
 
     duplicate_outputs = pset.duplicate_outputs()
     if len(duplicate_outputs) > 0:
-        print("Distinct projects producing the same output:")
+        emit("Distinct projects producing the same output:")
         for output, ids in duplicate_outputs.items():
-            print("  ", str(output.path))
+            emit("   " + str(output.path))
             for id in ids:
-                print("    ", str(id.path))
+                emit("     " + str(id.path))
 
     # We want to be able to do what ...
 
@@ -141,36 +156,42 @@ def main():
     # Ok, so now we want to join references with outputs to compute dependencies
 
     complete = pset.complete()
-    projects_by_output = pset.projects_by_output()
-    projects_by_output_name = MultiMap()
-    for assembly_id, project_id in projects_by_output.items():
-        projects_by_output_name.add(assembly_id.name, project_id)
-
-    for assembly_name, project_ids in projects_by_output_name.items():
-        if len(project_ids) > 1:
-            print(f"multiple producers for assembly {assembly_name}:")
-            for project_id in project_ids:
-                print(f"  {project_id.path}")
-
-    missing_assembly_refs = MultiMap()
+    projects_by_output_name = group_by_output_name(pset)
+
+    for assembly_name, producer_ids in projects_by_output_name.items():
+        if len(producer_ids) > 1:
+            emit(f"multiple producers for assembly {assembly_name}:")
+            for project_id in producer_ids:
+                emit(f"  {project_id.path}")
+
+    # References without a path resolve from the GAC or the framework, so
+    # only those pointing into the tree are expected to have a producer.
+    produced_names = projects_by_output_name.keys()
+    missing_assembly_refs: MultiMap[AssemblyId, ProjectId] = MultiMap()
+    add_missing = missing_assembly_refs.add
     for project_id, project in complete.items():
         for assembly_id in project.assembly_refs():
-            assembly_name = assembly_id.name
             if (
-                    assembly_name.startswith() and
-                    assembly_name not in projects_by_output_name
+                    assembly_id.path is not None and
+                    assembly_id.name not in produced_names
             ):
-                missing_assembly_refs.add(assembly_id, project_id)
+                add_missing(assembly_id, project_id)
 
     if len(missing_assembly_refs) > 0:
-        print("unsatisfied assembly deps:")
-        for assembly_id, project_ids in missing_assembly_refs.items():
-            print(f"  assembly: {assembly_id}")
-            print("    wanted by:")
-            for project_id in project_ids:
-                print(f"      {project_id}")
-
-    print("\n  ".join(["Build order:", *map(str, compute_build_order(pset))]))
+        emit("unsatisfied assembly deps:")
+        for assembly_id, consumer_ids in missing_assembly_refs.items():
+            emit(f"  assembly: {assembly_id}")
+            emit("    wanted by:")
+            for project_id in consumer_ids:
+                emit(f"      {project_id}")
+
+    # write the report before ordering, which raises on a dependency cycle
+    emit("")
+    sys.stdout.write("\n".join(lines))
+    sys.stdout.flush()
+
+    build_order = compute_build_order(pset, projects_by_output_name)
+    print("\n  ".join(["Build order:", *map(str, build_order)]))
 
     # for project_id, project in complete.items():
     #     for assembly_id in project.assembly_refs():
@@ -0,0 +1,40 @@
+import functools
+
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from typing import Optional
+
+from ..lib.id import ProjectId
+from ..lib.project import Project, ProjectLoadResult, ProjectRegistry, ProjectSet
+
+
+# Worker functions live here rather than in __main__: under spawn and
+# forkserver, multiprocessing cannot re-import a package's __main__ module in
+# the child, so functions defined there cannot be unpickled by the workers.
+
+
+def load_project(
+        config: Mapping[str, str],
+        project_id: ProjectId
+) -> ProjectLoadResult[Project]:
+    # Runs in a worker process: parsing a project never consults other
+    # projects, so a throwaway registry only has to carry the config.
+    return Project.load(ProjectRegistry(config.items()), project_id)
+
+
+def preload_projects(
+        project_set: ProjectSet,
+        config: Mapping[str, str],
+        project_ids: list[ProjectId],
+        mp_context: Optional[BaseContext] = None
+) -> None:
+    # Parse every project in parallel up front; the graph is resolved by the
+    # caller. Results are pickled back, so ids rebuild their hashes here.
+    with ProcessPoolExecutor(mp_context=mp_context) as executor:
+        results = executor.map(
+            functools.partial(load_project, config),
+            project_ids,
+            chunksize=8
+        )
+        project_set.preload(zip(project_ids, results))
@@ -0,0 +1,54 @@
+import multiprocessing
+import pickle
+import unittest
+
+from pathlib import Path
+
+from src.lib.id import Guid, ProjectId
+
+
+def _rebuilt_matches(guid: Guid, project_id: ProjectId) -> tuple[bool, bool]:
+    # Runs in a spawned child: the arguments arrive unpickled under that
+    # interpreter's hash seed, and must agree with ids built there.
+    fresh_guid = Guid(guid.raw)
+    fresh_project_id = ProjectId(project_id.name, project_id.path)
+    return (
+        hash(guid) == hash(fresh_guid) and guid in {fresh_guid},
+        hash(project_id) == hash(fresh_project_id) and
+        project_id in {fresh_project_id}
+    )
+
+
+class TestIdPickling(unittest.TestCase):
+
+    def test_pickle_recomputes_hash(self):
+        guid = Guid("1234-abcd")
+        project_id = ProjectId("App", Path("App/App.csproj"))
+        # stand in for a hash computed under another interpreter's seed
+        guid._hash = 1
+        project_id._hash = 1
+
+        guid_copy = pickle.loads(pickle.dumps(guid))
+        project_id_copy = pickle.loads(pickle.dumps(project_id))
+
+        self.assertEqual(guid_copy, guid)
+        self.assertEqual(hash(guid_copy), hash(Guid("1234-abcd")))
+        self.assertEqual(project_id_copy, project_id)
+        self.assertEqual(
+            hash(project_id_copy),
+            hash(ProjectId("App", Path("App/App.csproj")))
+        )
+
+    def test_hash_matches_in_spawned_child(self):
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1) as pool:
+            guid_ok, project_id_ok = pool.apply(
+                _rebuilt_matches,
+                (Guid("1234-abcd"), ProjectId("App", Path("App/App.csproj")))
+            )
+        self.assertTrue(guid_ok)
+        self.assertTrue(project_id_ok)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from src.lib.id import AssemblyId, Guid, ProjectId
+from src.lib.project import Project, ProjectLoadOk, ProjectRegistry
+
+
+_CSPROJ = r"""<Project xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <ItemGroup>
+    <ProjectReference Include="..\Lib\Lib.csproj">
+      <Project>{guid}</Project>
+      <Name>Lib</Name>
+    </ProjectReference>
+  </ItemGroup>
+</Project>
+"""
+
+_ASSEMBLY_CSPROJ = r"""<Project xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <ItemGroup>
+    <Reference Include="..\lib\{file}" />
+  </ItemGroup>
+</Project>
+"""
+
+
+class TestProjectRefs(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._dir = Path(self._tmp.name) / "App"
+        self._dir.mkdir()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _load(self, text: str) -> Project:
+        path = self._dir / "App.csproj"
+        path.write_text(text)
+        match Project.load(ProjectRegistry(), ProjectId("App", path)):
+            case ProjectLoadOk(project):
+                return project
+            case result:
+                self.fail(f"unexpected load result: {result}")
+
+    def _ref_guids(self, guid_text: str) -> set[Guid]:
+        project = self._load(_CSPROJ.replace("{guid}", guid_text))
+        (guids,) = project.project_ref_guids().values()
+        return set(guids)
+
+    def _assembly_refs(self, file: str) -> set[AssemblyId]:
+        project = self._load(_ASSEMBLY_CSPROJ.replace("{file}", file))
+        return set(project.assembly_refs())
+
+    def test_dll_include_in_any_case_is_a_path(self):
+        for file in ("Foo.dll", "Foo.DLL", "Foo.Dll"):
+            with self.subTest(file=file):
+                (assembly_id,) = self._assembly_refs(file)
+                self.assertEqual(assembly_id.name, "Foo")
+                self.assertEqual(
+                    assembly_id.path, Path(self._tmp.name) / "lib" / file
+                )
+
+    def test_braced_guid(self):
+        self.assertEqual(
+            self._ref_guids("{1111-abcd}"), {Guid("1111-ABCD")}
+        )
+
+    def test_doubled_braces_are_all_stripped(self):
+        self.assertEqual(self._ref_guids("{{weird}}"), {Guid("WEIRD")})
+
+
+if __name__ == "__main__":
+    unittest.main()
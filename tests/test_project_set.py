@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from src.lib.id import AssemblyId, Name, ProjectId
+from src.lib.project import ProjectSet
+
+
+_CSPROJ = r"""<Project xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <PropertyGroup>
+    <AssemblyName>{assembly}</AssemblyName>
+    <OutputPath>..\bin\</OutputPath>
+    <OutputType>Library</OutputType>
+  </PropertyGroup>
+</Project>
+"""
+
+
+class TestProjectOutputs(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        # project paths are repository-relative, as in scan_deps.main
+        os.chdir(self._tmp.name)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _write(self, name: str, assembly: str) -> ProjectId:
+        path = Path(name) / f"{name}.csproj"
+        path.parent.mkdir()
+        path.write_text(_CSPROJ.format(assembly=assembly))
+        return ProjectId(name, path)
+
+    def test_single_project_output(self):
+        project_id = self._write("App", "App")
+        project_set = ProjectSet()
+        project_set.add(project_id)
+
+        output = AssemblyId(Name("App"), Path("bin/App.dll"))
+        self.assertEqual(
+            dict(project_set.projects_by_output().items()), {output: project_id}
+        )
+        self.assertEqual(
+            dict(project_set.outputs_by_project().items()), {project_id: output}
+        )
+        self.assertEqual(len(project_set.duplicate_outputs()), 0)
+
+    def test_shared_output_is_a_duplicate(self):
+        first_id = self._write("App", "Shared")
+        second_id = self._write("Copy", "Shared")
+        project_set = ProjectSet()
+        project_set.add_many([first_id, second_id])
+
+        duplicates = project_set.duplicate_outputs()
+        self.assertEqual(len(duplicates), 1)
+        ((output, project_ids),) = duplicates.items()
+        self.assertEqual(output.path, Path("bin/Shared.dll"))
+        self.assertEqual(set(project_ids), {first_id, second_id})
+
+        self.assertNotIn(output, project_set.projects_by_output())
+        self.assertNotIn(first_id, project_set.outputs_by_project())
+        self.assertNotIn(second_id, project_set.outputs_by_project())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from src.lib.id import ProjectId
+from src.lib.project import ProjectSet
+from src.scan_deps.__main__ import compute_build_order
+from src.scan_deps.preload import load_project, preload_projects
+
+
+_APP_CSPROJ = r"""<Project xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <PropertyGroup>
+    <OutputType>Exe</OutputType>
+    <AssemblyName>App</AssemblyName>
+    <OutputPath>bin\</OutputPath>
+  </PropertyGroup>
+  <ItemGroup>
+    <ProjectReference Include="..\Lib\Lib.csproj">
+      <Project>{11111111-1111-1111-1111-111111111111}</Project>
+      <Name>Lib</Name>
+    </ProjectReference>
+  </ItemGroup>
+  <ItemGroup>
+    <Reference Include="Lib">
+      <HintPath>..\Lib\bin\Lib.dll</HintPath>
+    </Reference>
+  </ItemGroup>
+</Project>
+"""
+
+_LIB_CSPROJ = r"""<Project xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <PropertyGroup>
+    <OutputType>Library</OutputType>
+    <AssemblyName>Lib</AssemblyName>
+    <OutputPath>bin\</OutputPath>
+  </PropertyGroup>
+  <ItemGroup>
+    <ProjectReference Include="..\Gone\Gone.csproj">
+      <Project>{33333333-3333-3333-3333-333333333333}</Project>
+      <Name>Gone</Name>
+    </ProjectReference>
+  </ItemGroup>
+</Project>
+"""
+
+# Stands in for fd: lists files under a directory matching a pattern.
+_FAKE_FD = """import os, re, sys
+pattern, root = re.compile(sys.argv[1]), sys.argv[2]
+for parent, _, names in os.walk(root):
+    for name in sorted(names):
+        path = os.path.join(parent, name)
+        if pattern.search(path):
+            print(path)
+"""
+
+# Runs the CLI the way python -m does, with workers started by spawn.
+_RUN_SPAWNED = """import multiprocessing, runpy, sys
+multiprocessing.set_start_method("spawn")
+sys.argv = ["scan_deps", "."]
+runpy.run_module("src.scan_deps", run_name="__main__", alter_sys=True)
+"""
+
+
+class TestPreloadProjects(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        repo = Path(self._tmp.name)
+        for name, text in (("App", _APP_CSPROJ), ("Lib", _LIB_CSPROJ)):
+            (repo / name).mkdir()
+            (repo / name / f"{name}.csproj").write_text(text)
+        # App -> Lib -> Gone (dangling) leaves a single valid build order.
+        # Project ids are repository-relative, as in scan_deps.main.
+        os.chdir(repo)
+        self._project_ids = [
+            ProjectId(name, Path(name) / f"{name}.csproj")
+            for name in ("App", "Lib")
+        ]
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_spawn_build_order_matches_serial(self):
+        serial = ProjectSet()
+        serial.add_many(self._project_ids)
+        expected = compute_build_order(serial)
+
+        preloaded = ProjectSet()
+        preload_projects(
+            preloaded, dict(), self._project_ids,
+            multiprocessing.get_context("spawn")
+        )
+        preloaded.add_many(self._project_ids)
+        actual = compute_build_order(preloaded)
+
+        self.assertEqual(
+            [project_id.name for project_id in expected], ["Gone", "Lib", "App"]
+        )
+        self.assertEqual(list(map(str, actual)), list(map(str, expected)))
+        self.assertEqual(actual, expected)
+
+    def test_worker_is_importable_by_children(self):
+        # spawned workers cannot look functions up in a package's __main__
+        self.assertNotEqual(load_project.__module__, "__main__")
+        self.assertNotIn("__main__", preload_projects.__module__)
+
+    @unittest.skipIf(os.name == "nt", "fake fd is a POSIX script")
+    def test_cli_under_spawn(self):
+        bin_dir = Path(self._tmp.name) / "bin"
+        bin_dir.mkdir()
+        fd = bin_dir / "fd"
+        fd.write_text(f"#!{sys.executable}\n" + _FAKE_FD)
+        fd.chmod(0o755)
+        package_root = Path(__file__).resolve().parent.parent
+        env = dict(os.environ)
+        env["PATH"] = os.pathsep.join([str(bin_dir), env.get("PATH", "")])
+        env["PYTHONPATH"] = str(package_root)
+
+        result = subprocess.run(
+            [sys.executable, "-c", _RUN_SPAWNED],
+            capture_output=True, text=True, env=env
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn(
+            "\n  ".join([
+                "Build order:",
+                "ProjectId(Gone, Gone/Gone.csproj)",
+                "ProjectId(Lib, Lib/Lib.csproj)",
+                "ProjectId(App, App/App.csproj)",
+            ]),
+            result.stdout
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from src.lib.solution import Solution
+from src.scan_broken.__main__ import report_lines
+
+
+_CSPROJ_HEAD = r"""<Project xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <ItemGroup>
+"""
+
+_CSPROJ_REF = r"""    <ProjectReference Include="..\{name}\{name}.csproj">
+      <Project>{{{guid}}}</Project>
+      <Name>{name}</Name>
+    </ProjectReference>
+"""
+
+_CSPROJ_TAIL = r"""  </ItemGroup>
+</Project>
+"""
+
+_SLN_PROJECT = (
+    'Project("{{FAE04EC0-301F-11D3-BF4B-00C04F79EFBC}}") = '
+    '"{name}", "{name}\\{name}.csproj", "{{{guid}}}"\n'
+    'EndProject\n'
+)
+
+# A <-> B and C <-> D are two disjoint cycles; E hangs off A without one.
+_DISJOINT_REFS = {
+    "A": ("B", "E"),
+    "B": ("A",),
+    "C": ("D",),
+    "D": ("C",),
+    "E": (),
+}
+
+# One component with no simple cycle through all of it: B -> C is no edge.
+_FORKED_REFS = {
+    "A": ("B", "C"),
+    "B": ("A",),
+    "C": ("A",),
+}
+
+
+def _guid(name: str) -> str:
+    return name * 8 + "-0000-0000-0000-000000000000"
+
+
+class _SolutionTestCase(unittest.TestCase):
+
+    _refs: dict[str, tuple[str, ...]]
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        repo = Path(self._tmp.name)
+        sln = ["Microsoft Visual Studio Solution File\n"]
+        for name, refs in self._refs.items():
+            (repo / name).mkdir()
+            text = [_CSPROJ_HEAD]
+            for ref in refs:
+                text.append(_CSPROJ_REF.format(name=ref, guid=_guid(ref)))
+            text.append(_CSPROJ_TAIL)
+            (repo / name / f"{name}.csproj").write_text("".join(text))
+            sln.append(_SLN_PROJECT.format(name=name, guid=_guid(name)))
+        (repo / "all.sln").write_text("".join(sln))
+        # solution paths are repository-relative, as in scan_broken.main
+        os.chdir(repo)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+
+class TestDependencyCycles(_SolutionTestCase):
+
+    _refs = _DISJOINT_REFS
+
+    def test_every_cycle_is_reported(self):
+        solution = Solution("all.sln")
+        cycles = sorted(
+            sorted(project_id.name for project_id in cycle)
+            for cycle in solution.dependency_cycles()
+        )
+        self.assertEqual(cycles, [["A", "B"], ["C", "D"]])
+
+    def test_report_lists_both_cycles(self):
+        lines = report_lines(Solution("all.sln"))
+        start = lines.index("    dependency cycles:")
+        section = lines[start + 1:start + 7]
+        self.assertEqual(section.count("        cycle:"), 2)
+        self.assertEqual(
+            sorted(line.strip() for line in section if line.startswith(" " * 12)),
+            [f"{name}/{name}.csproj" for name in "ABCD"]
+        )
+
+
+class TestForkedCycle(_SolutionTestCase):
+
+    _refs = _FORKED_REFS
+
+    def test_cycle_is_a_closed_walk(self):
+        (cycle,) = Solution("all.sln").dependency_cycles()
+        names = [project_id.name for project_id in cycle]
+        self.assertEqual(set(names), {"A", "B", "C"})
+        # each member refs the next, and the last wraps round to the first
+        for name, next_name in zip(names, names[1:] + names[:1]):
+            self.assertIn(next_name, _FORKED_REFS[name])
+
+
+if __name__ == "__main__":
+    unittest.main()